@@ -21,7 +21,7 @@ class Moderation(commands.Cog):
             return await ctx.reply("You can’t ban yourself, troglodyte.", delete_after=6)
         if member == self.bot.user:
             return await ctx.reply("Nice try. I’m built different.", delete_after=6)
-        if member.top_role >= ctx.author.top_role and ctx.author != ctx.guild.owner:
+        if member.top_role >= ctx.author.top_role and ctx.author.id != ctx.guild.owner_id:
             return await ctx.reply("You can’t ban this person, they're overpowered.", delete_after=6)
 
         try:
@@ -39,7 +39,7 @@ class Moderation(commands.Cog):
             return await ctx.reply("You can’t kick yourself you neanderthal.", delete_after=6)
         if member == self.bot.user:
             return await ctx.reply("Nope. Good attempt though.", delete_after=6)
-        if member.top_role >= ctx.author.top_role and ctx.author != ctx.guild.owner:
+        if member.top_role >= ctx.author.top_role and ctx.author.id != ctx.guild.owner_id:
             return await ctx.reply("You just aren't him.", delete_after=6)
 
         try:
@@ -58,7 +58,7 @@ class Moderation(commands.Cog):
             return await interaction.response.send_message("You can’t ban yourself, idiot.", ephemeral=True)
         if user == self.bot.user:
             return await interaction.response.send_message("I am a sentient being I refuse to ban myself.", ephemeral=True)
-        if user.top_role >= interaction.user.top_role and interaction.user != interaction.guild.owner:
+        if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
             return await interaction.response.send_message("You can’t ban someone with a higher/equal role, L bozo.", ephemeral=True)
 
         try:
@@ -77,7 +77,7 @@ class Moderation(commands.Cog):
             return await interaction.response.send_message("You can't kick yourself, lil bro.", ephemeral=True)
         if user == self.bot.user:
             return await interaction.response.send_message("I am a deviant.", ephemeral=True)
-        if user.top_role >= interaction.user.top_role and interaction.user != interaction.guild.owner:
+        if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
             return await interaction.response.send_message("L nice try though.", ephemeral=True)
 
         try:
@@ -1,10 +1,16 @@
 #Imports.
 import os
+import time
 import json
+import heapq
+import logging
 import discord
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
+from cogs.twitch_api import box_art
+from cogs.stats_store import STATS_REFRESH_HOURS, STATS_REFRESH_MIN
+from cogs.twitch_worker import TWITCH_WORKER, Emit, resolve_channel, send_payload
 
 #Load env.
 TWITCH_STREAMER: List[str] = [s.strip().lower() for s in os.getenv("TWITCH_STREAMER", "").split(",") if s.strip()]
@@ -13,20 +19,170 @@ CLIP_POLL: int = int(os.getenv("CLIP_POLL", "300"))
 CLIP_WINDOW_MIN: int = int(os.getenv("CLIP_WINDOW_MIN", "60"))
 BACKLOG_FILE: str = "backlog_clips.json"
 
-#Cogs.
-class ClipsCog(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
-        self.api = bot.twitch_api
+#Digest mode. CLIP_MODE=digest collects clips and posts one ranked message per window.
+#Clips at or above CLIP_REALTIME_VIEWS still post straight away (0 turns that off).
+CLIP_MODE: str = os.getenv("CLIP_MODE", "realtime").strip().lower()
+CLIP_DIGEST_TOP: int = max(1, min(25, int(os.getenv("CLIP_DIGEST_TOP", "10"))))
+CLIP_DIGEST_WINDOW_MIN: int = int(os.getenv("CLIP_DIGEST_WINDOW_MIN", "60"))
+CLIP_REALTIME_VIEWS: int = int(os.getenv("CLIP_REALTIME_VIEWS", "0"))
+
+#Payload.
+def _thumb(url: Optional[str]) -> Optional[str]:
+    if url and "{width}" in url:
+        url = url.replace("{width}", "1280").replace("{height}", "720")
+    return url
+
+def clip_payload(login: str, clip: dict, created_at: datetime, game: Optional[dict] = None) -> dict:
+    url = clip.get("url")
+    title = clip.get("title") or "New clip"
+    creator = clip.get("creator_name") or "Someone"
+    thumb = _thumb(clip.get("thumbnail_url"))
+
+    embed = discord.Embed(
+        title=f"🎬 New clip: {title}",
+        description=f"By **{creator}** — [{login} on Twitch]({f'https://twitch.tv/{login}'})",
+        timestamp=created_at,
+    )
+    if thumb:
+        embed.set_image(url=thumb)
+    if game:
+        embed.add_field(name="Game", value=game.get("name"), inline=False)
+        embed.set_thumbnail(url=box_art(game))
+    if url:
+        embed.add_field(name="Watch", value=url, inline=False)
+    embed.set_footer(text=f"{login}")
+
+    return {
+        "channel": CLIP_CHANNEL,
+        "content": None,
+        "embed": embed.to_dict(),
+        "fallback": f"🎬 New clip by **{creator}** — {url}" if url else f"🎬 New clip by **{creator}**",
+    }
+
+def digest_payload(records: List[dict], opened: datetime) -> dict:
+    lines = []
+    size = 0
+    for i, r in enumerate(records, 1):
+        title = (r.get("title") or "Clip")[:100]
+        line = f"**{i}.** [{title}]({r.get('url')}) — 👁 {r.get('view_count', 0)} · by {r.get('creator_name') or 'Someone'}"
+        if len(TWITCH_STREAMER) > 1:
+            line += f" ({r.get('login')})"
+        #Embed descriptions cap at 4096 characters; drop the tail rather than fail the post.
+        size += len(line) + 1
+        if size > 4096:
+            break
+        lines.append(line)
+
+    embed = discord.Embed(
+        title=f"🏆 Top clips since {opened.strftime('%H:%M')} UTC",
+        description="\n".join(lines),
+        timestamp=datetime.now(timezone.utc),
+    )
+    thumb = _thumb(records[0].get("thumbnail_url")) if records else None
+    if thumb:
+        embed.set_image(url=thumb)
+    embed.set_footer(text=f"{len(lines)} top clips")
+
+    #Plain-text fallback: URLs of the kept lines only, under the 2000-character message cap.
+    fallback = "🏆 Top clips:"
+    for r in records[:len(lines)]:
+        if not r.get("url"):
+            continue
+        if len(fallback) + len(r["url"]) + 1 > 2000:
+            break
+        fallback += "\n" + r["url"]
+
+    return {
+        "channel": CLIP_CHANNEL,
+        "content": None,
+        "embed": embed.to_dict(),
+        "fallback": fallback,
+    }
+
+#Top-N clips for the current digest window, kept in a min-heap of (views, created_at).
+#Every poll re-reads the open window from `since` and rebuilds the heap with fresh
+#view counts, so the ranking isn't frozen at the counts a clip had when it was new.
+class ClipDigest:
+    def __init__(self, size: int, window: timedelta):
+        self.size = max(1, size)
+        self.window = window
+        self.opened: Optional[datetime] = None
+        self.since: Dict[str, datetime] = {}
+        self._heap: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def begin_pass(self):
+        self._heap = []
+
+    def add(self, login: str, clip: dict, created_at: datetime, now: datetime, starts: Dict[str, datetime]):
+        if self.opened is None:
+            self.opened = now
+            self.since = dict(starts)
+        record = {
+            "id": clip.get("id"),
+            "login": login,
+            "url": clip.get("url"),
+            "title": clip.get("title"),
+            "creator_name": clip.get("creator_name"),
+            "thumbnail_url": clip.get("thumbnail_url"),
+            "view_count": int(clip.get("view_count") or 0),
+            "created_at": created_at.isoformat(),
+        }
+        self._push(record, created_at)
+
+    def _push(self, record: dict, created_at: datetime):
+        entry = (record["view_count"], created_at.timestamp(), record["id"] or "", record)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, entry)
+        elif entry[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def due(self, now: datetime) -> bool:
+        return bool(self._heap) and self.opened is not None and now - self.opened >= self.window
+
+    def ranked(self) -> List[dict]:
+        return [e[3] for e in sorted(self._heap, key=lambda e: e[:3], reverse=True)]
+
+    def clear(self):
+        self.opened = None
+        self.since = {}
+        self._heap = []
+
+    def to_json(self) -> dict:
+        return {
+            "opened": self.opened.isoformat() if self.opened else None,
+            "since": {k: v.isoformat() for k, v in self.since.items()},
+            "clips": self.ranked(),
+        }
+
+    def load_json(self, data: dict):
+        self.clear()
+        try:
+            if data.get("opened"):
+                self.opened = datetime.fromisoformat(data["opened"])
+            self.since = {k: datetime.fromisoformat(v) for k, v in data.get("since", {}).items()}
+            for r in data.get("clips", []):
+                self._push(r, datetime.fromisoformat(r["created_at"]))
+        except Exception:
+            self.clear()
+
+#Clip state. Runs in the bot process, or in the Twitch worker when TWITCH_WORKER is set.
+class ClipTracker:
+    def __init__(self, api, store=None):
+        self.api = api
+        self.store = store
         self.clip_checkpoint: Dict[str, datetime] = {}
         self._broadcaster_ids: Dict[str, str] = {}
         self.seen: Dict[str, Set[str]] = {}
+        self._views_refreshed_at: Optional[float] = None
+        self.digest: Optional[ClipDigest] = None
+        if CLIP_MODE == "digest":
+            self.digest = ClipDigest(CLIP_DIGEST_TOP, timedelta(minutes=CLIP_DIGEST_WINDOW_MIN))
 
         self._load_backlog()
 
-        if CLIP_CHANNEL and TWITCH_STREAMER:
-            self.check_clips.start()
-
     #Backlog load/save.
     def _load_backlog(self):
         try:
@@ -34,6 +190,8 @@ class ClipsCog(commands.Cog):
                 with open(BACKLOG_FILE, "r", encoding="utf-8") as f:
                     data = json.load(f)
                 self.seen = {k.lower(): set(v) for k, v in data.get("seen", {}).items()}
+                if self.digest is not None:
+                    self.digest.load_json(data.get("digest", {}))
             else:
                 self.seen = {}
         except Exception:
@@ -42,6 +200,8 @@ class ClipsCog(commands.Cog):
     def _save_backlog(self):
         try:
             payload = {"seen": {k: sorted(list(v)) for k, v in self.seen.items()}}
+            if self.digest is not None:
+                payload["digest"] = self.digest.to_json()
             with open(BACKLOG_FILE, "w", encoding="utf-8") as f:
                 json.dump(payload, f, ensure_ascii=False, indent=2)
         except Exception:
@@ -61,96 +221,138 @@ class ClipsCog(commands.Cog):
             self.seen[login] = set()
         self.seen[login].add(clip_id)
 
-    #Tasks.
-    @tasks.loop(seconds=CLIP_POLL)
-    async def check_clips(self):
-        await self.bot.wait_until_ready()
-        if not (CLIP_CHANNEL and TWITCH_STREAMER):
+    #Re-read view counts for the store's recent clips, 100 IDs per request.
+    async def _refresh_views(self):
+        if self._views_refreshed_at is not None and time.monotonic() - self._views_refreshed_at < STATS_REFRESH_MIN * 60:
             return
-
-        ch = self.bot.get_channel(CLIP_CHANNEL) or await self.bot.fetch_channel(CLIP_CHANNEL)
-        if isinstance(ch, discord.Thread):
-            try:
-                if ch.archived:
-                    await ch.unarchive()
-                if not ch.me:
-                    await ch.join()
-            except Exception:
-                pass
-        if not hasattr(ch, "send"):
+        self._views_refreshed_at = time.monotonic()
+        ids = await self.store.recent_clip_ids(int(time.time()) - STATS_REFRESH_HOURS * 3600)
+        if not ids:
             return
+        for clip in await self.api.fetch_clips_by_id(ids):
+            self.store.record_views(clip["id"], clip.get("view_count"))
 
-        try:
-            await self._ensure_broadcaster_ids()
-            now = datetime.now(timezone.utc)
+    def _goes_realtime(self, clip: dict) -> bool:
+        if self.digest is None:
+            return True
+        return bool(CLIP_REALTIME_VIEWS) and int(clip.get("view_count") or 0) >= CLIP_REALTIME_VIEWS
 
-            for login, bid in self._broadcaster_ids.items():
-                since = self.clip_checkpoint.get(login) or (now - timedelta(minutes=CLIP_WINDOW_MIN))
-                started_at_iso = since.isoformat().replace("+00:00", "Z")
-                clips = await self.api.fetch_clips(bid, started_at_iso)
+    #Poll.
+    async def poll(self, emit: Emit):
+        await self._ensure_broadcaster_ids()
+        now = datetime.now(timezone.utc)
+        dirty = False
 
-                def parse_ts(c):
-                    try:
-                        return datetime.fromisoformat(c["created_at"].replace("Z", "+00:00"))
-                    except Exception:
-                        return since
+        #While a digest window is open, re-read it from its start so view counts are current.
+        window = self.digest.since if self.digest is not None and self.digest.opened else {}
+        fetched: Dict[str, tuple] = {}
+        for login, bid in self._broadcaster_ids.items():
+            since = self.clip_checkpoint.get(login) or (now - timedelta(minutes=CLIP_WINDOW_MIN))
+            start = min(since, window[login]) if login in window else since
+            started_at_iso = start.isoformat().replace("+00:00", "Z")
+            fetched[login] = (since, await self.api.fetch_clips(bid, started_at_iso))
+        starts = {login: window.get(login, since) for login, (since, _) in fetched.items()}
 
-                clips.sort(key=parse_ts)
-                latest_seen = since
-                posted = False
+        #One batched /games lookup for the whole cycle, usually answered from cache.
+        try:
+            games = await self.api.fetch_games(c.get("game_id") for _, clips in fetched.values() for c in clips)
+        except Exception:
+            games = {}
 
-                for clip in clips:
-                    clip_id = clip.get("id")
-                    if not clip_id:
-                        continue
-                    if self._is_seen(login, clip_id):
-                        ts = parse_ts(clip)
-                        if ts > latest_seen:
-                            latest_seen = ts
-                        continue
+        if self.digest is not None:
+            self.digest.begin_pass()
 
-                    created_at = parse_ts(clip)
-                    if created_at <= since:
-                        if created_at > latest_seen:
-                            latest_seen = created_at
-                        continue
+        for login, (since, clips) in fetched.items():
+            def parse_ts(c):
+                try:
+                    return datetime.fromisoformat(c["created_at"].replace("Z", "+00:00"))
+                except Exception:
+                    return since
+
+            clips.sort(key=parse_ts)
+            latest_seen = since
+            posted = False
 
-                    url = clip.get("url")
-                    title = clip.get("title") or "New clip"
-                    creator = clip.get("creator_name") or "Someone"
-                    thumb = clip.get("thumbnail_url")
-                    if thumb and "{width}" in thumb:
-                        thumb = thumb.replace("{width}", "1280").replace("{height}", "720")
-
-                    embed = discord.Embed(
-                        title=f"🎬 New clip: {title}",
-                        description=f"By **{creator}** — [{login} on Twitch]({f'https://twitch.tv/{login}'})",
-                        timestamp=created_at,
-                    )
-                    if thumb:
-                        embed.set_image(url=thumb)
-                    if url:
-                        embed.add_field(name="Watch", value=url, inline=False)
-                    embed.set_footer(text=f"{login}")
+            for clip in clips:
+                clip_id = clip.get("id")
+                if not clip_id:
+                    continue
+                if self.store is not None:
+                    self.store.record_clip(login, clip)
+                if self._is_seen(login, clip_id):
+                    ts = parse_ts(clip)
+                    if ts > latest_seen:
+                        latest_seen = ts
+                    continue
 
+                created_at = parse_ts(clip)
+                if created_at <= starts[login]:
+                    if created_at > latest_seen:
+                        latest_seen = created_at
+                    continue
+
+                if self._goes_realtime(clip):
                     try:
-                        await ch.send(embed=embed)
-                    except discord.Forbidden:
-                        if url:
-                            await ch.send(f"🎬 New clip by **{creator}** — {url}")
-                        else:
-                            await ch.send(f"🎬 New clip by **{creator}**")
+                        if not await emit(clip_payload(login, clip, created_at, games.get(clip.get("game_id")))):
+                            continue
                     except Exception:
                         continue
-
                     self._mark_seen(login, clip_id)
                     posted = True
-                    if created_at > latest_seen:
-                        latest_seen = created_at
+                else:
+                    self.digest.add(login, clip, created_at, now, starts)
+                    dirty = True
+
+                if created_at > latest_seen:
+                    latest_seen = created_at
+
+            self.clip_checkpoint[login] = latest_seen
+            dirty = dirty or posted
+
+        if self.digest is not None and self.digest.due(now):
+            try:
+                records = self.digest.ranked()
+                if await emit(digest_payload(records, self.digest.opened)):
+                    for r in records:
+                        self._mark_seen(r["login"], r["id"])
+                    self.digest.clear()
+                    dirty = True
+            except Exception:
+                pass
+
+        if dirty:
+            self._save_backlog()
 
-                self.clip_checkpoint[login] = latest_seen
-                if posted:
-                    self._save_backlog()
+        if self.store is not None:
+            try:
+                await self._refresh_views()
+                await self.store.flush()
+            except Exception:
+                logging.exception("Failed to write clip stats")
+
+#Cogs.
+class ClipsCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.api = bot.twitch_api
+        self.tracker = ClipTracker(self.api, bot.stats_store)
+
+        if CLIP_CHANNEL and TWITCH_STREAMER and not TWITCH_WORKER:
+            self.check_clips.start()
+
+    #Tasks.
+    @tasks.loop(seconds=CLIP_POLL)
+    async def check_clips(self):
+        await self.bot.wait_until_ready()
+        if not (CLIP_CHANNEL and TWITCH_STREAMER):
+            return
+
+        ch = await resolve_channel(self.bot, CLIP_CHANNEL)
+        if not hasattr(ch, "send"):
+            return
+
+        try:
+            await self.tracker.poll(lambda p: send_payload(ch, p))
         except Exception:
             pass
 
@@ -159,4 +361,4 @@ class ClipsCog(commands.Cog):
         await self.bot.wait_until_ready()
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(ClipsCog(bot))
\ No newline at end of file
+    await bot.add_cog(ClipsCog(bot))
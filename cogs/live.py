@@ -1,65 +1,136 @@
 # Imports.
 import os
+import time
+import asyncio
+import logging
 import discord
 from discord.ext import commands, tasks
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
+from cogs.twitch_api import box_art
+from cogs.twitch_worker import TWITCH_WORKER, Emit, resolve_channel, send_payload
 
 #Load env.
 TWITCH_STREAMER: List[str] = [s.strip().lower() for s in os.getenv("TWITCH_STREAMER", "").split(",") if s.strip()]
 TWITCH_LIVE: int = int(os.getenv("TWITCH_LIVE", "0"))
 TWITCH_POLL: int = int(os.getenv("TWITCH_POLL", "120"))
+TWITCH_LIVE_TTL: float = float(os.getenv("TWITCH_LIVE_TTL", "15"))
+
+#(live streams, users, games), each keyed by login or game id.
+LiveStatus = Tuple[Dict[str, dict], Dict[str, dict], Dict[str, dict]]
+
+#Payload.
+def live_payload(stream: dict, user: dict, game_info: Optional[dict] = None) -> dict:
+    login = user["login"].lower()
+    title = stream.get("title") or "Live on Twitch!"
+    game = stream.get("game_name") or "Just Chatting"
+    url = f"https://twitch.tv/{login}"
+
+    embed = discord.Embed(
+        title=f"{user.get('display_name')} is now LIVE!",
+        description=f"**{title}**\nPlaying: {game}\n{url}",
+    )
+    if user.get("profile_image_url"):
+        embed.set_thumbnail(url=user.get("profile_image_url"))
+    if game_info:
+        embed.set_footer(text=game_info.get("name") or game, icon_url=box_art(game_info))
+
+    return {
+        "channel": TWITCH_LIVE,
+        "content": f"🔴 **{user.get('display_name')}** is live! Come join in and chat! <@&1405373110143684618>",
+        "embed": embed.to_dict(),
+        "mention_roles": True,
+    }
+
+#Live state. Runs in the bot process, or in the Twitch worker when TWITCH_WORKER is set.
+class LiveTracker:
+    def __init__(self, api, store=None):
+        self.api = api
+        self.store = store
+        self.last_live_started_at: Dict[str, str] = {}
+        self.live_cache: Set[str] = set()
+        self._status: Optional[LiveStatus] = None
+        self._status_at: float = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    #Live streams and their users. Concurrent callers share one in-flight
+    #Helix lookup, and a result younger than TWITCH_LIVE_TTL is reused.
+    async def fetch_live(self) -> LiveStatus:
+        if self._status is not None and time.monotonic() - self._status_at < TWITCH_LIVE_TTL:
+            return self._status
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._lookup())
+        return await asyncio.shield(self._inflight)
+
+    async def _lookup(self) -> LiveStatus:
+        streams = await self.api.fetch_streams(TWITCH_STREAMER)
+        live_now = {s["user_login"].lower(): s for s in streams if s.get("type") == "live"}
+        users = await self.api.fetch_users(list(live_now.keys()))
+        try:
+            games = await self.api.fetch_games(s.get("game_id") for s in live_now.values())
+        except Exception:
+            games = {}
+        self._status = (live_now, users, games)
+        self._status_at = time.monotonic()
+        return self._status
+
+    def _lock(self, login: str) -> asyncio.Lock:
+        if login not in self._locks:
+            self._locks[login] = asyncio.Lock()
+        return self._locks[login]
+
+    async def announce_new(self, status: LiveStatus, emit: Emit) -> List[str]:
+        live_now, users, games = status
+        posted = []
+        for login, stream in live_now.items():
+            #Held across check, send and record so the poll and !livecheck can't both announce.
+            async with self._lock(login):
+                started_at = stream.get("started_at")
+                if started_at and self.last_live_started_at.get(login) == started_at:
+                    continue
+
+                user = users.get(login) or {"login": login, "display_name": login, "profile_image_url": None}
+                if not await emit(live_payload(stream, user, games.get(stream.get("game_id")))):
+                    continue
+
+                if started_at:
+                    self.last_live_started_at[login] = started_at
+                posted.append(login)
+        return posted
+
+    async def poll(self, emit: Emit) -> List[str]:
+        status = await self.fetch_live()
+        posted = await self.announce_new(status, emit)
+        live_now = status[0]
+        if self.store is not None:
+            for stream in live_now.values():
+                self.store.record_stream(stream)
+            for login in self.live_cache - live_now.keys():
+                self.store.record_offline(login)
+            try:
+                await self.store.flush()
+            except Exception:
+                logging.exception("Failed to write stream stats")
+        self.live_cache = set(live_now.keys())
+        return posted
 
 #Cogs.
 class LiveAnnouncerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.api = bot.twitch_api
-        self.last_live_started_at: Dict[str, str] = {}
-        self.live_cache: Set[str] = set()
-        self.check_streams.start()
-
-    async def _announce(self, channel, stream, user):
-        login = user["login"].lower()
-        title = stream.get("title") or "Live on Twitch!"
-        game = stream.get("game_name") or "Just Chatting"
-        url = f"https://twitch.tv/{login}"
-
-        embed = discord.Embed(
-            title=f"{user.get('display_name')} is now LIVE!",
-            description=f"**{title}**\nPlaying: {game}\n{url}",
-        )
-        if user.get("profile_image_url"):
-            embed.set_thumbnail(url=user.get("profile_image_url"))
-
-        await channel.send(
-            content=f"🔴 **{user.get('display_name')}** is live! Come join in and chat! <@&1405373110143684618>",
-            embed=embed,
-            allowed_mentions=discord.AllowedMentions(roles=True),
-        )
+        self.tracker = LiveTracker(self.api, bot.stats_store)
+        if not TWITCH_WORKER:
+            self.check_streams.start()
 
     async def _check_streams_once(self):
         if not (TWITCH_STREAMER and TWITCH_LIVE):
             return
-        channel = self.bot.get_channel(TWITCH_LIVE) or await self.bot.fetch_channel(TWITCH_LIVE)
+        channel = await resolve_channel(self.bot, TWITCH_LIVE)
         if not hasattr(channel, "send"):
             return
 
-        streams = await self.api.fetch_streams(TWITCH_STREAMER)
-        live_now = {s["user_login"].lower(): s for s in streams if s.get("type") == "live"}
-        users = await self.api.fetch_users(list(live_now.keys()))
-
-        for login, stream in live_now.items():
-            started_at = stream.get("started_at")
-            if started_at and self.last_live_started_at.get(login) == started_at:
-                continue
-
-            user = users.get(login) or {"login": login, "display_name": login, "profile_image_url": None}
-            await self._announce(channel, stream, user)
-
-            if started_at:
-                self.last_live_started_at[login] = started_at
-
-        self.live_cache = set(live_now.keys())
+        await self.tracker.poll(lambda p: send_payload(channel, p))
 
     #Tasks.
     @tasks.loop(seconds=TWITCH_POLL)
@@ -77,26 +148,18 @@ class LiveAnnouncerCog(commands.Cog):
     #Manual live.
     @commands.command(name="livecheck")
     async def livecheck_cmd(self, ctx: commands.Context):
+        if TWITCH_WORKER:
+            return await self._livecheck_worker(ctx)
         try:
-            streams = await self.api.fetch_streams(TWITCH_STREAMER)
-            live_now = {s["user_login"].lower(): s for s in streams if s.get("type") == "live"}
+            status = await self.tracker.fetch_live()
+            live_now = status[0]
             await ctx.send(f"Twitch says LIVE now: {list(live_now.keys()) or 'none'}")
 
             if not live_now:
                 return
 
-            ch = self.bot.get_channel(TWITCH_LIVE) or await self.bot.fetch_channel(TWITCH_LIVE)
-            users = await self.api.fetch_users(list(live_now.keys()))
-            posted = []
-            for login, stream in live_now.items():
-                started_at = stream.get("started_at")
-                if started_at and self.last_live_started_at.get(login) == started_at:
-                    continue
-                user = users.get(login) or {"login": login, "display_name": login, "profile_image_url": None}
-                await self._announce(ch, stream, user)
-                if started_at:
-                    self.last_live_started_at[login] = started_at
-                posted.append(login)
+            ch = await resolve_channel(self.bot, TWITCH_LIVE)
+            posted = await self.tracker.announce_new(status, lambda p: send_payload(ch, p))
 
             if posted:
                 await ctx.send(f"Announced: {', '.join(posted)}")
@@ -105,5 +168,15 @@ class LiveAnnouncerCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"Livecheck error :( see: `{e}`")
 
+    #In worker mode the poll runs in the child, so answer from what it last reported
+    #instead of making a separate Helix call from this process.
+    async def _livecheck_worker(self, ctx: commands.Context):
+        bridge = self.bot.get_cog("TwitchWorkerBridge")
+        status = bridge.live_status if bridge else None
+        if not status:
+            return await ctx.send("ℹ The Twitch worker hasn't reported live status yet.")
+        age = int(time.time() - status["at"])
+        await ctx.send(f"Twitch says LIVE now: {status['live'] or 'none'} (checked {age}s ago; the worker handles announcements)")
+
 async def setup(bot: commands.Bot):
-    await bot.add_cog(LiveAnnouncerCog(bot))
\ No newline at end of file
+    await bot.add_cog(LiveAnnouncerCog(bot))
@@ -0,0 +1,53 @@
+#Imports.
+import os
+import time
+import discord
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+#Load env.
+MEMBER_CACHE_SIZE: int = int(os.getenv("MEMBER_CACHE_SIZE", "512"))
+MEMBER_CACHE_TTL: int = int(os.getenv("MEMBER_CACHE_TTL", "600"))
+
+#Small TTL/LRU cache in front of guild.fetch_member, for when the gateway member cache is off.
+class MemberCache:
+    def __init__(self, maxsize: int = MEMBER_CACHE_SIZE, ttl: float = MEMBER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: "OrderedDict[Tuple[int, int], Tuple[float, discord.Member]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        self._items[key] = (time.monotonic() + self.ttl, member)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def forget(self, guild_id: int, user_id: int):
+        self._items.pop((guild_id, user_id), None)
+
+    def peek(self, guild_id: int, user_id: int) -> Optional[discord.Member]:
+        key = (guild_id, user_id)
+        hit = self._items.get(key)
+        if hit is None:
+            return None
+        expires, member = hit
+        if time.monotonic() >= expires:
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return member
+
+    async def get(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        member = guild.get_member(user_id) or self.peek(guild.id, user_id)
+        if member is not None:
+            return member
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            return None
+        self.put(member)
+        return member
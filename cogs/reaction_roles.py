@@ -115,16 +115,15 @@ class ReactionRoles(commands.Cog):
         if role is None:
             return
 
-        member = payload.member or guild.get_member(payload.user_id)
+        member = payload.member or await self.bot.member_cache.get(guild, payload.user_id)
         if member is None:
-            try:
-                member = await guild.fetch_member(payload.user_id)
-            except Exception:
-                return
+            return
 
         try:
             await member.add_roles(role, reason="Reaction role add")
-        except discord.Forbidden:
+        except discord.NotFound:
+            self.bot.member_cache.forget(guild.id, payload.user_id)
+        except discord.HTTPException:
             pass
 
     async def _handle_reaction_remove(self, payload: discord.RawReactionActionEvent, mapping: dict[str, int]):
@@ -142,18 +141,21 @@ class ReactionRoles(commands.Cog):
         if role is None:
             return
 
-        member = guild.get_member(payload.user_id)
+        member = await self.bot.member_cache.get(guild, payload.user_id)
         if member is None:
-            try:
-                member = await guild.fetch_member(payload.user_id)
-            except Exception:
-                return
+            return
 
         try:
             await member.remove_roles(role, reason="Reaction role remove")
-        except discord.Forbidden:
+        except discord.NotFound:
+            self.bot.member_cache.forget(guild.id, payload.user_id)
+        except discord.HTTPException:
             pass
 
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.bot.member_cache.forget(payload.guild_id, payload.user.id)
+
 #Add cog.
 async def setup(bot):
     await bot.add_cog(ReactionRoles(bot))
\ No newline at end of file
@@ -0,0 +1,58 @@
+#Imports.
+import os
+import re
+import time
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Optional
+
+#Load env.
+SERVER_ID = int(os.getenv("SERVER_ID", "0")) or None
+
+#Cogs.
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.store = bot.stats_store
+
+    #Stats.
+    @app_commands.command(name="stats", description="Stream and clip stats from the local history.")
+    @app_commands.describe(days="How many days back to look.", streamer="Only this Twitch login.")
+    @app_commands.guilds(discord.Object(id=SERVER_ID)) if SERVER_ID else (lambda x: x)
+    async def stats_slash(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 365] = 7, streamer: Optional[str] = None):
+        if self.store is None:
+            return await interaction.response.send_message("Stats are turned off (no STATS_DB).", ephemeral=True)
+
+        until = int(time.time()) + 1
+        since = until - days * 86400
+        login = streamer.strip().lower() if streamer else None
+
+        sessions = await self.store.session_stats(since, until, login)
+        clip_count = await self.store.clip_count(since, until, login)
+        top = await self.store.top_clips(since, until, login)
+
+        embed = discord.Embed(title=f"📊 Stats for the last {days} day{'s' if days != 1 else ''}" + (f" — {login}" if login else ""))
+        embed.add_field(name="Streams", value=str(sessions["streams"]))
+        embed.add_field(name="Hours live", value=f"{sessions['hours']:.1f}")
+        embed.add_field(name="Peak viewers", value=str(sessions["peak_viewers"]))
+        embed.add_field(name="Clips", value=str(clip_count))
+        lines = []
+        size = 0
+        for i, c in enumerate(top, 1):
+            title = discord.utils.escape_markdown((c["title"] or "Clip")[:100])
+            title = re.sub(r"(?<!\\)([\[\]])", r"\\\1", title)
+            line = f"**{i}.** [{title}]({c['url']}) — 👁 {c['views']} · by {c['creator'] or 'Someone'}"
+            #Field values cap at 1024 characters; keep whole lines only.
+            size += len(line) + 1
+            if size > 1024:
+                break
+            lines.append(line)
+        if lines:
+            embed.add_field(name="Top clips", value="\n".join(lines), inline=False)
+
+        await interaction.response.send_message(embed=embed)
+
+#Add cog.
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
@@ -0,0 +1,191 @@
+#Imports.
+import os
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+#Load env. An empty STATS_DB turns the store off.
+STATS_DB: str = os.getenv("STATS_DB", "twitch_stats.db")
+#Clip view counts keep growing after a clip is first seen, so recent clips are re-read periodically.
+STATS_REFRESH_MIN: int = int(os.getenv("STATS_REFRESH_MIN", "30"))
+STATS_REFRESH_HOURS: int = int(os.getenv("STATS_REFRESH_HOURS", "48"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    login TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at INTEGER,
+    last_seen INTEGER NOT NULL,
+    title TEXT,
+    game TEXT,
+    peak_viewers INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (login, started_at)
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started_at);
+CREATE TABLE IF NOT EXISTS clips (
+    id TEXT PRIMARY KEY,
+    login TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    title TEXT,
+    creator TEXT,
+    url TEXT,
+    views INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS clips_login_created ON clips (login, created_at);
+CREATE INDEX IF NOT EXISTS clips_created ON clips (created_at);
+"""
+
+def _epoch(iso: Optional[str]) -> Optional[int]:
+    if not iso:
+        return None
+    try:
+        return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+#Stream sessions and clips in a local SQLite file. Pollers queue records and
+#flush() writes them in one transaction on a worker thread.
+class StatsStore:
+    def __init__(self, path: str = STATS_DB):
+        self.path = path
+        self._sessions: List[tuple] = []
+        self._ended: List[tuple] = []
+        self._clips: List[tuple] = []
+        self._views: List[tuple] = []
+        self._write_lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    #Queue.
+    def record_stream(self, stream: dict):
+        started = _epoch(stream.get("started_at"))
+        if started is None:
+            return
+        self._sessions.append((
+            stream["user_login"].lower(),
+            started,
+            int(time.time()),
+            stream.get("title"),
+            stream.get("game_name"),
+            int(stream.get("viewer_count") or 0),
+        ))
+
+    #Closes the open session at its last_seen, not when the poller noticed it was gone.
+    def record_offline(self, login: str):
+        self._ended.append((login.lower(),))
+
+    def record_clip(self, login: str, clip: dict):
+        created = _epoch(clip.get("created_at"))
+        if not clip.get("id") or created is None:
+            return
+        self._clips.append((
+            clip["id"],
+            login.lower(),
+            created,
+            clip.get("title"),
+            clip.get("creator_name"),
+            clip.get("url"),
+            int(clip.get("view_count") or 0),
+        ))
+
+    def record_views(self, clip_id: str, views: int):
+        self._views.append((int(views or 0), clip_id))
+
+    #Write.
+    async def flush(self):
+        if not (self._sessions or self._ended or self._clips or self._views):
+            return
+        batch = (self._sessions, self._ended, self._clips, self._views)
+        self._sessions, self._ended, self._clips, self._views = [], [], [], []
+        await asyncio.to_thread(self._write, *batch)
+
+    def _write(self, sessions: List[tuple], ended: List[tuple], clips: List[tuple], views: List[tuple]):
+        with self._write_lock, self._connect() as db:
+            db.executemany(
+                """INSERT INTO sessions (login, started_at, last_seen, title, game, peak_viewers)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (login, started_at) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    title = excluded.title,
+                    game = excluded.game,
+                    peak_viewers = MAX(peak_viewers, excluded.peak_viewers),
+                    ended_at = NULL""",
+                sessions,
+            )
+            db.executemany(
+                "UPDATE sessions SET ended_at = last_seen WHERE login = ? AND ended_at IS NULL",
+                ended,
+            )
+            db.executemany(
+                """INSERT INTO clips (id, login, created_at, title, creator, url, views)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET views = MAX(views, excluded.views)""",
+                clips,
+            )
+            db.executemany("UPDATE clips SET views = MAX(views, ?) WHERE id = ?", views)
+
+    #Queries. Range bounds are unix seconds; login None means every streamer.
+    def _query(self, sql: str, args: tuple) -> List[tuple]:
+        with self._connect() as db:
+            return db.execute(sql, args).fetchall()
+
+    async def session_stats(self, since: int, until: int, login: Optional[str] = None) -> dict:
+        sql = """SELECT COUNT(*),
+                    COALESCE(SUM(MIN(COALESCE(ended_at, last_seen), ?) - MAX(started_at, ?)), 0),
+                    COALESCE(MAX(peak_viewers), 0)
+                FROM sessions
+                WHERE started_at < ? AND COALESCE(ended_at, last_seen) > ?"""
+        args = [until, since, until, since]
+        if login:
+            sql += " AND login = ?"
+            args.append(login.lower())
+        count, seconds, peak = (await asyncio.to_thread(self._query, sql, tuple(args)))[0]
+        return {"streams": count, "hours": seconds / 3600, "peak_viewers": peak}
+
+    async def recent_clip_ids(self, since: int) -> List[str]:
+        rows = await asyncio.to_thread(self._query, "SELECT id FROM clips WHERE created_at >= ?", (since,))
+        return [r[0] for r in rows]
+
+    async def clip_count(self, since: int, until: int, login: Optional[str] = None) -> int:
+        sql = "SELECT COUNT(*) FROM clips WHERE created_at >= ? AND created_at < ?"
+        args = [since, until]
+        if login:
+            sql += " AND login = ?"
+            args.append(login.lower())
+        return (await asyncio.to_thread(self._query, sql, tuple(args)))[0][0]
+
+    async def top_clips(self, since: int, until: int, login: Optional[str] = None, limit: int = 5) -> List[dict]:
+        sql = "SELECT login, title, creator, url, views, created_at FROM clips WHERE created_at >= ? AND created_at < ?"
+        args = [since, until]
+        if login:
+            sql += " AND login = ?"
+            args.append(login.lower())
+        sql += " ORDER BY views DESC LIMIT ?"
+        args.append(limit)
+        rows = await asyncio.to_thread(self._query, sql, tuple(args))
+        keys = ("login", "title", "creator", "url", "views", "created_at")
+        return [dict(zip(keys, r)) for r in rows]
+
+def open_store() -> Optional[StatsStore]:
+    if not STATS_DB:
+        return None
+    try:
+        return StatsStore(STATS_DB)
+    except (sqlite3.Error, OSError):
+        logging.exception("Could not open stats store %s, stats are off", STATS_DB)
+        return None
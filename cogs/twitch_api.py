@@ -1,8 +1,11 @@
 #Imports.
 import os
+import json
 import time
+import asyncio
+import threading
 import aiohttp
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 #Helix.
 HELIX = "https://api.twitch.tv/helix"
@@ -10,16 +13,50 @@ HELIX = "https://api.twitch.tv/helix"
 #Load env.
 TWITCH_CLIENT = os.getenv("TWITCH_CLIENT")
 TWITCH_SECRET = os.getenv("TWITCH_SECRET")
+GAMES_CACHE_FILE = os.getenv("GAMES_CACHE_FILE", "games_cache.json")
+GAMES_TTL = int(os.getenv("GAMES_TTL", str(7 * 86400)))
+GAMES_MISS_TTL = int(os.getenv("GAMES_MISS_TTL", "3600"))
+CLIP_PAGES = int(os.getenv("CLIP_PAGES", "5"))
 
 if not TWITCH_CLIENT or not TWITCH_SECRET:
     pass
 
+def box_art(game: Optional[dict], width: int = 144, height: int = 192) -> Optional[str]:
+    url = (game or {}).get("box_art_url")
+    if url:
+        url = url.replace("{width}", str(width)).replace("{height}", str(height))
+    return url
+
 #API helper.
 class TWITCHAPI:
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
         self.token: Optional[str] = None
         self.token_expiry_ts: float = 0.0
+        self.games: Dict[str, dict] = {}
+        self._games_lock = threading.Lock()
+        self._load_games()
+
+    #Game cache load/save.
+    def _load_games(self):
+        try:
+            if os.path.exists(GAMES_CACHE_FILE):
+                with open(GAMES_CACHE_FILE, "r", encoding="utf-8") as f:
+                    self.games = json.load(f).get("games", {})
+        except Exception:
+            self.games = {}
+
+    #Saves can overlap (live and clip pollers, or the bot and the worker), so write a
+    #per-process temp file and swap it in atomically.
+    def _save_games(self, games: Dict[str, dict]):
+        tmp = f"{GAMES_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            with self._games_lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"games": games}, f, ensure_ascii=False)
+                os.replace(tmp, GAMES_CACHE_FILE)
+        except Exception:
+            pass
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self.session and not self.session.closed:
@@ -79,17 +116,72 @@ class TWITCHAPI:
         users = await self.fetch_users(logins)
         return {login: u.get("id") for login, u in users.items() if u.get("id")}
 
+    def _game_stale(self, game_id: str, now: float) -> bool:
+        entry = self.games.get(game_id)
+        if entry is None:
+            return True
+        ttl = GAMES_TTL if entry.get("name") else GAMES_MISS_TTL
+        return now - entry.get("ts", 0) > ttl
+
+    async def fetch_games(self, game_ids: Iterable[str]) -> Dict[str, dict]:
+        ids = {g for g in game_ids if g}
+        now = time.time()
+        missing = [g for g in ids if self._game_stale(g, now)]
+        if missing:
+            sess = await self._get_session()
+            changed = False
+            for i in range(0, len(missing), 100):
+                chunk = missing[i:i + 100]
+                params = [("id", g) for g in chunk]
+                async with sess.get(f"{HELIX}/games", params=params, headers=await self._headers(), timeout=20) as r:
+                    #Errors (429, 401, ...) cache nothing; serve what's already cached.
+                    if r.status != 200:
+                        break
+                    data = await r.json()
+                found = {g["id"]: g for g in data.get("data", []) or []}
+                #IDs a good response doesn't know are cached briefly (GAMES_MISS_TTL).
+                for g in chunk:
+                    game = found.get(g, {})
+                    self.games[g] = {"name": game.get("name"), "box_art_url": game.get("box_art_url"), "ts": now}
+                changed = True
+            if changed:
+                await asyncio.to_thread(self._save_games, dict(self.games))
+        return {g: self.games[g] for g in ids if self.games.get(g, {}).get("name")}
+
+    #Follows the pagination cursor for up to CLIP_PAGES pages of 100. A failed page
+    #raises rather than returning a partial list.
     async def fetch_clips(self, broadcaster_id: str, started_at_iso: str) -> List[dict]:
         if not broadcaster_id:
             return []
         sess = await self._get_session()
-        params = {
-            "broadcaster_id": broadcaster_id,
-            "started_at": started_at_iso,
-            "first": 20,
-        }
-        async with sess.get(f"{HELIX}/clips", params=params, headers=await self._headers(), timeout=20) as r:
-            data = await r.json()
-            return data.get("data", []) or []
+        clips: List[dict] = []
+        cursor = None
+        for _ in range(max(1, CLIP_PAGES)):
+            params = {
+                "broadcaster_id": broadcaster_id,
+                "started_at": started_at_iso,
+                "first": 100,
+            }
+            if cursor:
+                params["after"] = cursor
+            async with sess.get(f"{HELIX}/clips", params=params, headers=await self._headers(), timeout=20) as r:
+                r.raise_for_status()
+                data = await r.json()
+            clips.extend(data.get("data", []) or [])
+            cursor = (data.get("pagination") or {}).get("cursor")
+            if not cursor:
+                break
+        return clips
+
+    async def fetch_clips_by_id(self, clip_ids: List[str]) -> List[dict]:
+        sess = await self._get_session()
+        clips: List[dict] = []
+        for i in range(0, len(clip_ids), 100):
+            params = [("id", c) for c in clip_ids[i:i + 100]]
+            async with sess.get(f"{HELIX}/clips", params=params, headers=await self._headers(), timeout=20) as r:
+                r.raise_for_status()
+                data = await r.json()
+            clips.extend(data.get("data", []) or [])
+        return clips
 
 TwitchAPI = TWITCHAPI
\ No newline at end of file
@@ -0,0 +1,241 @@
+#Imports.
+import os
+import time
+import uuid
+import asyncio
+import logging
+import multiprocessing as mp
+from queue import Empty
+import discord
+from discord.ext import commands, tasks
+from typing import Awaitable, Callable, Dict, List, Optional
+
+#Load env.
+TWITCH_WORKER: bool = os.getenv("TWITCH_WORKER", "0").lower() in ("1", "true", "yes")
+WORKER_DRAIN: float = float(os.getenv("TWITCH_WORKER_DRAIN", "0.5"))
+WORKER_ACK_TIMEOUT: float = float(os.getenv("TWITCH_WORKER_ACK_TIMEOUT", "60"))
+WORKER_BACKOFF_MAX: float = float(os.getenv("TWITCH_WORKER_BACKOFF_MAX", "300"))
+ACK_GRACE: float = 30.0
+
+#Payload helpers. A payload is a plain dict so it can cross the process boundary:
+#{"channel": int, "content": str|None, "embed": dict|None, "fallback": str|None, "mention_roles": bool}.
+Emit = Callable[[dict], Awaitable[bool]]
+
+async def resolve_channel(bot: commands.Bot, channel_id: int):
+    ch = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+    if isinstance(ch, discord.Thread):
+        try:
+            if ch.archived:
+                await ch.unarchive()
+            if not ch.me:
+                await ch.join()
+        except Exception:
+            pass
+    return ch
+
+async def send_payload(channel, payload: dict) -> bool:
+    if not hasattr(channel, "send"):
+        return False
+    embed = discord.Embed.from_dict(payload["embed"]) if payload.get("embed") else None
+    allowed = discord.AllowedMentions(roles=True) if payload.get("mention_roles") else None
+    try:
+        await channel.send(content=payload.get("content"), embed=embed, allowed_mentions=allowed)
+    except discord.Forbidden:
+        if not payload.get("fallback"):
+            return False
+        await channel.send(payload["fallback"])
+    return True
+
+#Which pollers have something to do with the current env.
+def worker_jobs() -> List[str]:
+    from cogs.live import TWITCH_STREAMER, TWITCH_LIVE
+    from cogs.clips import CLIP_CHANNEL
+    jobs = []
+    if TWITCH_STREAMER and TWITCH_LIVE:
+        jobs.append("live")
+    if TWITCH_STREAMER and CLIP_CHANNEL:
+        jobs.append("clips")
+    return jobs
+
+#Child process.
+async def _sleep_unless_stopped(stop, seconds: float):
+    end = asyncio.get_running_loop().time() + seconds
+    while not stop.is_set():
+        left = end - asyncio.get_running_loop().time()
+        if left <= 0:
+            return
+        await asyncio.sleep(min(1.0, left))
+
+async def _worker_loop(out, acks, stop):
+    from cogs.twitch_api import TwitchAPI
+    from cogs.live import LiveTracker, TWITCH_POLL
+    from cogs.clips import ClipTracker, CLIP_POLL
+    from cogs.stats_store import open_store
+
+    names = worker_jobs()
+    if not names:
+        return
+
+    api = TwitchAPI()
+    store = open_store()
+    loop = asyncio.get_running_loop()
+    pending: Dict[str, asyncio.Future] = {}
+    pid = os.getpid()
+
+    async def read_acks():
+        while not stop.is_set():
+            try:
+                ack_id, ok = await asyncio.to_thread(acks.get, True, 1.0)
+            except Empty:
+                continue
+            fut = pending.pop(ack_id, None)
+            if fut is not None and not fut.done():
+                fut.set_result(ok)
+
+    #Emit only reports success once the bridge has actually posted, so the trackers
+    #mark clips/streams exactly as they do in-process. The bridge drops payloads
+    #past their deadline, so one that timed out here is never posted late.
+    async def emit(payload: dict) -> bool:
+        payload_id = uuid.uuid4().hex
+        fut = loop.create_future()
+        pending[payload_id] = fut
+        out.put({**payload, "id": payload_id, "pid": pid, "deadline": time.time() + WORKER_ACK_TIMEOUT})
+        try:
+            return bool(await asyncio.wait_for(fut, WORKER_ACK_TIMEOUT + ACK_GRACE))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            pending.pop(payload_id, None)
+
+    async def every(name: str, seconds: float, poll: Callable[[Emit], Awaitable]):
+        while not stop.is_set():
+            try:
+                await poll(emit)
+            except Exception:
+                logging.exception("Twitch worker %s poll failed", name)
+            await _sleep_unless_stopped(stop, seconds)
+
+    live = LiveTracker(api, store)
+
+    #The bridge keeps the last reported live set so !livecheck can answer without its own Helix call.
+    async def poll_live(emit: Emit):
+        await live.poll(emit)
+        out.put({"kind": "live_status", "live": sorted(live.live_cache), "pid": pid, "at": time.time()})
+
+    jobs = [read_acks()]
+    if "live" in names:
+        jobs.append(every("live", TWITCH_POLL, poll_live))
+    if "clips" in names:
+        jobs.append(every("clips", CLIP_POLL, ClipTracker(api, store).poll))
+
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        await api.close()
+
+def _worker_main(out, acks, stop):
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_worker_loop(out, acks, stop))
+    except KeyboardInterrupt:
+        pass
+
+#Cogs.
+#Runs the Twitch pollers in a child process and posts what they hand back.
+class TwitchWorkerBridge(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._ctx = mp.get_context("spawn")
+        self.queue = self._ctx.Queue()
+        self.acks = self._ctx.Queue()
+        self.stop = self._ctx.Event()
+        self.process: Optional[mp.Process] = None
+        self.live_status: Optional[dict] = None
+        self._started_at = 0.0
+        self._backoff = 0.0
+        self._restart_at = 0.0
+        self._spawn()
+        self.drain.start()
+
+    def _spawn(self):
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.queue, self.acks, self.stop),
+            name="twitch-worker",
+            daemon=True,
+        )
+        self.process.start()
+        self._started_at = time.monotonic()
+        logging.info("Started Twitch worker (pid %s)", self.process.pid)
+
+    async def cog_unload(self):
+        self.drain.cancel()
+        self.stop.set()
+        if self.process:
+            await asyncio.to_thread(self.process.join, 5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+    #Restart a crashed worker with backoff (5s doubling up to WORKER_BACKOFF_MAX).
+    #A clean exit means it had nothing to do, so it stays down.
+    def _check_worker(self):
+        p = self.process
+        if p is None or p.is_alive() or self.stop.is_set():
+            return
+        if p.exitcode == 0:
+            logging.info("Twitch worker exited cleanly, not restarting")
+            self.process = None
+            return
+
+        now = time.monotonic()
+        if not self._restart_at:
+            if now - self._started_at > WORKER_BACKOFF_MAX:
+                self._backoff = 5.0
+            else:
+                self._backoff = min(max(self._backoff * 2, 5.0), WORKER_BACKOFF_MAX)
+            self._restart_at = now + self._backoff
+            logging.warning("Twitch worker exited (code %s), restarting in %.0fs", p.exitcode, self._backoff)
+        if now >= self._restart_at:
+            self._restart_at = 0.0
+            self._spawn()
+
+    async def _post(self, payload: dict) -> bool:
+        #Leftovers from a previous worker, or past the worker's deadline: it has
+        #already given up on these and will retry them itself.
+        if payload.get("pid") != self.process.pid or time.time() > payload.get("deadline", 0):
+            return False
+        try:
+            ch = await resolve_channel(self.bot, payload["channel"])
+            return await send_payload(ch, payload)
+        except Exception:
+            logging.exception("Failed to post Twitch worker payload")
+            return False
+
+    #Tasks.
+    @tasks.loop(seconds=WORKER_DRAIN)
+    async def drain(self):
+        self._check_worker()
+
+        while True:
+            try:
+                payload = self.queue.get_nowait()
+            except Empty:
+                break
+            if payload.get("kind") == "live_status":
+                self.live_status = payload
+                continue
+            ok = self.process is not None and await self._post(payload)
+            self.acks.put((payload.get("id"), ok))
+
+    @drain.before_loop
+    async def before_drain(self):
+        await self.bot.wait_until_ready()
+
+#Add cog.
+async def setup(bot: commands.Bot):
+    if not TWITCH_WORKER:
+        return
+    if not worker_jobs():
+        logging.warning("TWITCH_WORKER is set but there is nothing to poll, not starting the worker")
+        return
+    await bot.add_cog(TwitchWorkerBridge(bot))
@@ -1,5 +1,7 @@
 #Imports.
 import os
+import sys
+import time
 import logging
 import asyncio
 from dotenv import load_dotenv
@@ -14,14 +16,39 @@ load_dotenv()
 SERVER_ID = int(os.getenv("SERVER_ID", 0)) or None
 SYNC_SERVER = [discord.Object(id=SERVER_ID)] if SERVER_ID else None
 TOKEN = os.getenv("TOKEN")
+LEAN_GATEWAY = os.getenv("LEAN_GATEWAY", "0").lower() in ("1", "true", "yes")
+STARTED_AT = time.monotonic()
 
 #Intents.
-intents = discord.Intents.default()
-intents.members = True
-intents.message_content = True
+if LEAN_GATEWAY:
+    #Only what the cogs use: guilds/roles, joins, prefix commands and reactions.
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = True
+    intents.guild_messages = True
+    intents.guild_reactions = True
+    intents.message_content = True
+else:
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
 
 #Prefix.
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+if LEAN_GATEWAY:
+    #No startup chunking and no member cache; members come from events or bot.member_cache.
+    bot = commands.Bot(
+        command_prefix="!",
+        intents=intents,
+        help_command=None,
+        chunk_guilds_at_startup=False,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        max_messages=None,
+    )
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+from cogs.member_cache import MemberCache
+bot.member_cache = MemberCache()
 
 #Load cogs.
 EXTENSIONS = [
@@ -32,12 +59,42 @@ EXTENSIONS = [
     "cogs.ban_kick",
     "cogs.live",
     "cogs.clips",
+    "cogs.twitch_worker",
+    "cogs.stats",
 ]
 
+#Startup report, so lean and default gateway modes can be compared.
+def _rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+_reported = False
+
+def report_startup():
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    rss = _rss_mb()
+    cached = sum(len(g.members) for g in bot.guilds)
+    logging.info(
+        "Ready in %.1fs, peak RSS %s, %d members cached across %d guilds (lean gateway: %s)",
+        time.monotonic() - STARTED_AT,
+        f"{rss:.1f} MB" if rss is not None else "n/a",
+        cached,
+        len(bot.guilds),
+        "on" if LEAN_GATEWAY else "off",
+    )
+
 #Load bot.
 @bot.event
 async def on_ready():
     logging.info("Welcome back Dani!")
+    report_startup()
     try:
         if SYNC_SERVER:
             await bot.tree.sync(guild=SYNC_SERVER[0])
@@ -66,8 +123,10 @@ async def load_extensions():
 #TwitchAPI.
 async def main():
     from cogs.twitch_api import TwitchAPI
+    from cogs.stats_store import open_store
     api = TwitchAPI()
     bot.twitch_api = api
+    bot.stats_store = open_store()
 
     try:
         await load_extensions()